@@ -1,13 +1,12 @@
 """
 Finance Analysis Agents using CrewAI
 """
-from crewai import Agent
-from langchain_groq import ChatGroq
+from crewai import Agent, LLM
 import os
 
-# Initialize the LLM
-llm = ChatGroq(
-    model="llama-3.3-70b-versatile",
+# Initialize the LLM as a native CrewAI LLM, which Agent uses as-is
+llm = LLM(
+    model="groq/llama-3.3-70b-versatile",
     temperature=0.7,
     api_key=os.getenv("GROQ_API_KEY")
 )
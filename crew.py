@@ -1,49 +1,137 @@
 """
 CrewAI Crew for Finance Analysis
 """
-from crewai import Crew, Process
-from agents import spending_analyst, financial_advisor
-from tasks import create_analysis_task, create_recommendation_task
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, List, Optional
 
-def analyze_finances(transaction_data: str) -> dict:
+from llm_cache import LLM_CACHE_TTL_SECONDS, get_disk_cache
+
+if TYPE_CHECKING:
+    from crewai import Crew
+
+# Modules whose contents (prompts, agent model and settings) determine the results
+_PROMPT_SOURCES = ("agents.py", "tasks.py")
+
+# In-process results, checked before the (opt-in) disk cache; least recently used
+# entries are evicted past the limit
+RESULTS_MEMORY_SIZE = 32
+_results_memory: "OrderedDict[str, dict]" = OrderedDict()
+
+def create_finance_crew(on_task_complete: Optional[Callable] = None) -> "Crew":
+    """Build the two-agent crew; transaction data is supplied as kickoff input"""
+    # CrewAI and the agents are imported lazily: cached results never need them
+    from crewai import Crew, Process
+    from agents import spending_analyst, financial_advisor
+    from tasks import create_analysis_task, create_recommendation_task
+    
+    analysis_task = create_analysis_task()
+    recommendation_task = create_recommendation_task(analysis_task)
+    
+    return Crew(
+        agents=[spending_analyst, financial_advisor],
+        tasks=[analysis_task, recommendation_task],
+        process=Process.sequential,
+        verbose=True,
+        task_callback=on_task_complete
+    )
+
+@lru_cache(maxsize=None)
+def _prompt_version() -> str:
+    """Hash of the agent and task definitions, so edits invalidate cached results"""
+    digest = hashlib.sha256()
+    for name in _PROMPT_SOURCES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def _cache_key(transaction_data: str) -> str:
+    data_hash = hashlib.sha256(transaction_data.encode("utf-8")).hexdigest()
+    return f"analysis:{_prompt_version()}:{data_hash}"
+
+def _get_cached(transaction_data: str) -> Optional[dict]:
+    key = _cache_key(transaction_data)
+    if key in _results_memory:
+        _results_memory.move_to_end(key)
+        return _results_memory[key]
+    results_cache = get_disk_cache()
+    results = results_cache.get(key) if results_cache is not None else None
+    if results is not None:
+        _remember(key, results)
+    return results
+
+def _set_cached(transaction_data: str, results: dict) -> None:
+    key = _cache_key(transaction_data)
+    _remember(key, results)
+    results_cache = get_disk_cache()
+    if results_cache is not None:
+        results_cache.set(key, results, expire=LLM_CACHE_TTL_SECONDS)
+
+def _remember(key: str, results: dict) -> None:
+    _results_memory[key] = results
+    _results_memory.move_to_end(key)
+    while len(_results_memory) > RESULTS_MEMORY_SIZE:
+        _results_memory.popitem(last=False)
+
+def _results_from_output(crew_output) -> dict:
+    analysis_output, recommendation_output = crew_output.tasks_output
+    return {
+        'analysis': str(analysis_output),
+        'recommendations': str(recommendation_output)
+    }
+
+def analyze_finances(transaction_data: str, on_task_complete: Optional[Callable] = None) -> dict:
     """
     Run the finance analysis crew
     
+    Both agents run in a single sequential crew; the recommendation task
+    receives the analysis output as context instead of a second kickoff.
+    
     Args:
         transaction_data: String representation of transaction data
+        on_task_complete: Optional callback invoked with each task's output as soon
+            as it finishes, so callers can render partial results
         
     Returns:
         dict: Combined results from both agents
     """
-    # Create tasks
-    analysis_task = create_analysis_task(transaction_data)
+    cached = _get_cached(transaction_data)
+    if cached is not None:
+        if on_task_complete:
+            on_task_complete(cached['analysis'])
+            on_task_complete(cached['recommendations'])
+        return cached
     
-    # First crew: Analyze spending
-    analysis_crew = Crew(
-        agents=[spending_analyst],
-        tasks=[analysis_task],
-        process=Process.sequential,
-        verbose=True
-    )
+    finance_crew = create_finance_crew(on_task_complete)
     
-    # Execute analysis
-    analysis_result = analysis_crew.kickoff()
+    # Execute analysis and recommendations in one run
+    crew_output = finance_crew.kickoff(inputs={'transaction_data': transaction_data})
     
-    # Create recommendation task based on analysis
-    recommendation_task = create_recommendation_task(str(analysis_result))
+    results = _results_from_output(crew_output)
+    _set_cached(transaction_data, results)
+    return results
+
+def analyze_statements(transaction_data_list: List[str]) -> List[dict]:
+    """
+    Run the finance analysis crew over several statements concurrently
     
-    # Second crew: Generate recommendations
-    recommendation_crew = Crew(
-        agents=[financial_advisor],
-        tasks=[recommendation_task],
-        process=Process.sequential,
-        verbose=True
-    )
+    Args:
+        transaction_data_list: String representations of each statement's transactions
+        
+    Returns:
+        list: Results dicts, in the same order as the input statements
+    """
+    results = [_get_cached(data) for data in transaction_data_list]
+    pending = [i for i, result in enumerate(results) if result is None]
     
-    # Execute recommendations
-    recommendation_result = recommendation_crew.kickoff()
+    if pending:
+        inputs = [{'transaction_data': transaction_data_list[i]} for i in pending]
+        crew_outputs = asyncio.run(create_finance_crew().kickoff_for_each_async(inputs=inputs))
+        for i, crew_output in zip(pending, crew_outputs):
+            results[i] = _results_from_output(crew_output)
+            _set_cached(transaction_data_list[i], results[i])
     
-    return {
-        'analysis': str(analysis_result),
-        'recommendations': str(recommendation_result)
-    }
+    return results
@@ -0,0 +1,26 @@
+"""
+Optional on-disk cache for LLM completions and analysis results
+"""
+import os
+from typing import Optional
+
+from diskcache import Cache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Off by default: cached entries hold users' transactions and analyses
+DISK_CACHE_ENABLED = os.getenv("LLM_DISK_CACHE", "").lower() in {"1", "true", "yes"}
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "./.llm_cache")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+
+_disk_cache = None
+
+def get_disk_cache() -> Optional[Cache]:
+    """Return the shared disk cache, or None when disk caching is disabled"""
+    global _disk_cache
+    if not DISK_CACHE_ENABLED:
+        return None
+    if _disk_cache is None:
+        _disk_cache = Cache(LLM_CACHE_DIR)
+    return _disk_cache
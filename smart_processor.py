@@ -2,50 +2,269 @@
 Smart Bank Statement Processor using AI
 Handles any format of bank statement
 """
+import asyncio
+import hashlib
+import io
 import json
 import os
 import re
+import textwrap
+import threading
+import time
 from datetime import datetime
-from typing import List, Optional
+from functools import lru_cache
+from typing import BinaryIO, List, Optional, Union
 
+import numpy as np
+import orjson
 import pandas as pd
 import pdfplumber
+import pypdfium2 as pdfium
 from dotenv import load_dotenv
+from groq import RateLimitError
 from langchain_groq import ChatGroq
 
+from llm_cache import LLM_CACHE_TTL_SECONDS, get_disk_cache
+
 load_dotenv()
 
+# Groq models by latency tier. Extraction is structural work, so it uses the
+# fast tier; the reasoning agents in agents.py stay on the 70B model.
+SPEED_MAP = {
+    "fast": "llama-3.1-8b-instant",
+    "quality": "llama-3.3-70b-versatile",
+}
+
+# Output budget for AI extraction, sized from the expected transaction count
+TOKENS_PER_TRANSACTION = 60
+MIN_CHARS_PER_TRANSACTION = 60
+MAX_EXTRACTION_TOKENS = 4096
+
+# Everything except digits, sign and decimal point, i.e. currency symbols
+# (₹, $, Rs, INR), thousands separators and whitespace
+_NON_NUMERIC_RE = re.compile(r"[^\d.\-]")
+_INR_RE = re.compile(r"₹|inr|rupee", re.IGNORECASE)
+_USD_RE = re.compile(r"\$|usd|dollar", re.IGNORECASE)
+# Headers that are never a signed amount column: one-sided debit/credit columns
+# ("Withdrawal Amt.", "Deposit Amt.", a bare "Dr"), balances and dates ("Value Dt").
+# "Amount (Dr/Cr)" is still a signed amount, so Dr/Cr only counts as the whole header.
+_NOT_AMOUNT_HEADER_RE = re.compile(
+    r"withdraw|deposit|debit|credit|balance|date|\bdt\b|^\s*(dr|cr)\.?\s*$", re.IGNORECASE
+)
+
+# Keyword rules for cheap client-side categorization; the first match wins
+CATEGORY_PATTERNS = {
+    "Groceries": r"grocer|supermarket|bigbasket|blinkit|zepto|dmart",
+    "Food & Dining": r"restaurant|dining|cafe|coffee|food|swiggy|zomato|pizza|starbucks",
+    "Transport": r"uber|\bola\b|fuel|petrol|diesel|gas station|metro|taxi|parking|toll",
+    "Bills & Utilities": r"bill|electric|utility|water|broadband|internet|recharge|airtel|jio",
+    "Subscriptions": r"subscription|netflix|spotify|prime|hotstar|youtube",
+    "Shopping": r"amazon|flipkart|myntra|shopping|store|mall",
+    "Rent & EMI": r"\brent\b|\bemi\b|loan",
+    "Cash": r"\batm\b|cash",
+    "Transfers": r"upi|neft|imps|rtgs|transfer",
+}
+
+# Description of the placeholder record returned when a statement has no transactions
+NO_TRANSACTIONS_DESCRIPTION = "No transactions found"
+
+# Only the largest transactions are sent to the LLM alongside the totals
+LLM_TOP_TRANSACTIONS = 50
+LLM_TOP_MERCHANTS = 10
+
+# Long text statements are extracted in overlapping chunks, a few at a time
+# to stay inside Groq rate limits
+EXTRACTION_CHUNK_CHARS = 3500
+EXTRACTION_CHUNK_OVERLAP = 200
+MAX_CONCURRENT_EXTRACTIONS = 5
+EXTRACTION_RETRIES = 3
+EXTRACTION_BACKOFF_SECONDS = 2
+
+# Minimum rapidfuzz WRatio score for a header to count as a keyword match
+FUZZY_COLUMN_CUTOFF = 80
+
+
+# PDFium is not thread-safe, even across separate documents, and one processor
+# serves every Streamlit session
+_PDFIUM_LOCK = threading.Lock()
+
+
+def _as_file(source: Union[str, bytes]):
+    """Return a path unchanged, or wrap in-memory file contents for readers"""
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+class StatementExtractionError(RuntimeError):
+    """Raised when part of a statement could not be extracted by the AI"""
+
+
 class SmartBankStatementProcessor:
     """Process bank statements of any format using AI"""
     
     def __init__(self):
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0,
-            api_key=os.getenv("GROQ_API_KEY")
-        )
+        self._llms = {}
+        # Completions are deterministic (temperature=0), so they are memoized in
+        # memory and, when enabled, on disk keyed by SHA-256 of model + prompt
+        self._disk_cache = get_disk_cache()
+        self._cached_completion = lru_cache(maxsize=256)(self._completion)
+
+    def _get_llm(self, tier: str) -> ChatGroq:
+        """Return the (lazily created) JSON-mode Groq client for a speed tier"""
+        if tier not in self._llms:
+            self._llms[tier] = ChatGroq(
+                model=SPEED_MAP[tier],
+                temperature=0,
+                model_kwargs={"response_format": {"type": "json_object"}},
+                # Rate limits are retried with backoff by _ai_extract_transactions;
+                # SDK retries on top would multiply the attempts per chunk
+                max_retries=0,
+                api_key=os.getenv("GROQ_API_KEY")
+            )
+        return self._llms[tier]
+
+    def _invoke_llm(self, prompt: str, tier: str = "fast", max_tokens: Optional[int] = None) -> str:
+        """Run a prompt on the given tier and return the JSON completion text"""
+        return self._cached_completion(SPEED_MAP[tier], tier, prompt, max_tokens)
+
+    def _completion(self, model: str, tier: str, prompt: str, max_tokens: Optional[int]) -> str:
+        """Return a completion from the disk cache, calling Groq on a miss"""
+        key = hashlib.sha256(f"{model}:{max_tokens}:json:{prompt}".encode("utf-8")).hexdigest()
+        if self._disk_cache is not None:
+            cached = self._disk_cache.get(key)
+            if cached is not None:
+                return cached
+
+        call_kwargs = {"max_tokens": max_tokens} if max_tokens else {}
+        content = self._get_llm(tier).invoke(prompt, **call_kwargs).content
+        if self._disk_cache is not None:
+            self._disk_cache.set(key, content, expire=LLM_CACHE_TTL_SECONDS)
+        return content
     
-    def process_file(self, file_path: str) -> str:
+    def process_file(self, file: Union[str, BinaryIO], file_name: Optional[str] = None) -> str:
         """
-        Process any bank statement file and return transaction data as text
+        Process any bank statement file and return a compact summary for the LLM
         
         Args:
-            file_path: Path to the bank statement file
+            file: Path to the bank statement file, or an open binary file
+            file_name: Name used to detect the format of a file object
             
         Returns:
-            String representation of transactions for AI analysis
+            JSON summary of the statement for AI analysis
         """
-        file_type = self._detect_file_type(file_path)
+        return self.summarize_for_llm(self.extract_transactions(file, file_name))
+
+    def extract_transactions(self, file: Union[str, BinaryIO], file_name: Optional[str] = None) -> List[dict]:
+        """
+        Extract the full list of transactions from any bank statement file
+        
+        Args:
+            file: Path to the bank statement file, or an open binary file
+                (e.g. a Streamlit upload) read directly from memory
+            file_name: Name used to detect the format of a file object;
+                defaults to the path itself
+            
+        Returns:
+            List of transaction records
+        """
+        if isinstance(file, str):
+            source = file
+            file_name = file_name or file
+        else:
+            source = file.getvalue() if hasattr(file, "getvalue") else file.read()
+            file_name = file_name or getattr(file, "name", "")
+
+        file_type = self._detect_file_type(file_name)
 
         if file_type in {"csv", "excel"}:
-            df = self._read_tabular_file(file_path, file_type)
+            df = self._read_tabular_file(source, file_type)
             transactions = self._extract_from_dataframe(df)
         else:
-            raw_content = self._read_text_file(file_path)
-            ai_result = self._ai_extract_transactions(raw_content)
-            transactions = self._parse_ai_transactions(ai_result)
+            raw_content = self._read_text_file(source, file_type)
+            chunks = self._split_statement(raw_content)
+            chunk_records = asyncio.run(self._ai_extract_chunks(chunks))
+            failures = [result for result in chunk_records if isinstance(result, Exception)]
+            if failures:
+                # A partial list would be summed as if it were the whole statement
+                raise StatementExtractionError(
+                    f"{len(failures)} of {len(chunks)} statement sections could not be "
+                    f"extracted ({failures[0]}). Please try again in a moment."
+                ) from failures[0]
+            transactions = self._merge_chunk_transactions(chunk_records)
+
+        return transactions
+
+    def summarize_for_llm(self, transactions: List[dict]) -> str:
+        """
+        Aggregate transactions into category/merchant totals plus the largest
+        transactions, so prompt size stays flat however long the statement is
+        
+        Args:
+            transactions: Records from extract_transactions
+            
+        Returns:
+            JSON summary of the statement for AI analysis
+        """
+        df = pd.DataFrame(transactions, columns=["Date", "Description", "Amount"])
+        df = df[df["Description"] != NO_TRANSACTIONS_DESCRIPTION].copy()
+        df["Amount"] = df["Amount"].astype(float)
+        df["Category"] = self._categorize(df["Description"])
+        currency = transactions[0].get("_currency") if transactions else None
+
+        expenses = df[df["Amount"] < 0].assign(Spent=lambda frame: -frame["Amount"])
+        category_totals = (
+            expenses.groupby("Category")["Spent"].agg(["sum", "count"])
+            .sort_values("sum", ascending=False)
+        )
+        merchant_totals = (
+            expenses.groupby("Description")["Spent"].agg(["sum", "count"])
+            .nlargest(LLM_TOP_MERCHANTS, "sum")
+        )
+        top_transactions = df.loc[
+            df["Amount"].abs().nlargest(LLM_TOP_TRANSACTIONS).index,
+            ["Date", "Description", "Amount", "Category"],
+        ]
 
-        return json.dumps(transactions, indent=2, ensure_ascii=False)
+        # Extraction already normalized dates to YYYY-MM-DD; anything else ("Unknown",
+        # unparsed raw text) is skipped rather than re-guessed month-first
+        dates = pd.to_datetime(df["Date"], errors="coerce", format="%Y-%m-%d").dropna()
+        days = (dates.max() - dates.min()).days + 1 if not dates.empty else None
+        total_spending = round(float(expenses["Spent"].sum()), 2)
+
+        summary = {
+            "currency": currency or self._detect_currency(df["Description"]),
+            "transaction_count": len(df),
+            "date_range": {
+                "start": dates.min().date().isoformat() if days else "Unknown",
+                "end": dates.max().date().isoformat() if days else "Unknown",
+                "days": days,
+            },
+            "total_spending": total_spending,
+            "total_income": round(float(df.loc[df["Amount"] > 0, "Amount"].sum()), 2),
+            "average_daily_spending": round(total_spending / days, 2) if days else None,
+            "category_totals": {
+                category: {"total": round(float(row["sum"]), 2), "count": int(row["count"])}
+                for category, row in category_totals.iterrows()
+            },
+            "top_merchants": {
+                merchant: {"total": round(float(row["sum"]), 2), "count": int(row["count"])}
+                for merchant, row in merchant_totals.iterrows()
+            },
+            "top_transactions": top_transactions.round({"Amount": 2}).to_dict("records"),
+        }
+
+        # Compact UTF-8 JSON: the output is only read by the LLM, and indentation
+        # would add roughly 30% more input tokens
+        return orjson.dumps(summary, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+
+    def _categorize(self, descriptions: pd.Series) -> pd.Series:
+        """Assign each description the first matching CATEGORY_PATTERNS category"""
+        descriptions = descriptions.astype(str)
+        conditions = [
+            descriptions.str.contains(pattern, case=False, regex=True).to_numpy(dtype=bool)
+            for pattern in CATEGORY_PATTERNS.values()
+        ]
+        categories = np.select(conditions, list(CATEGORY_PATTERNS), default="Other")
+        return pd.Series(categories, index=descriptions.index)
     
     def _detect_file_type(self, file_path: str) -> str:
         path_lower = file_path.lower()
@@ -57,52 +276,134 @@ class SmartBankStatementProcessor:
             return "pdf"
         return "text"
 
-    def _read_tabular_file(self, file_path: str, file_type: str) -> pd.DataFrame:
+    def _read_tabular_file(self, source: Union[str, bytes], file_type: str) -> pd.DataFrame:
+        # Arrow's CSV reader and calamine are much faster than the default
+        # engines; fall back when they are missing or reject the file
         if file_type == "csv":
-            return pd.read_csv(file_path)
-        return pd.read_excel(file_path)
-
-    def _read_text_file(self, file_path: str) -> str:
-        if file_path.endswith(".pdf"):
-            text_chunks = []
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text_chunks.append(page_text)
-            return "\n".join(text_chunks)
-
-        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            try:
+                return pd.read_csv(_as_file(source), engine="pyarrow", dtype_backend="pyarrow")
+            except (ImportError, ValueError):
+                return pd.read_csv(_as_file(source))
+        try:
+            return pd.read_excel(_as_file(source), engine="calamine", dtype_backend="pyarrow")
+        except (ImportError, ValueError):
+            return pd.read_excel(_as_file(source))
+
+    def _read_text_file(self, source: Union[str, bytes], file_type: str) -> str:
+        if file_type == "pdf":
+            try:
+                text_chunks = self._read_pdf_pages_fast(source)
+            except Exception:
+                # pdfplumber copes with some malformed PDFs that pdfium rejects
+                text_chunks = self._read_pdf_pages(source)
+            return "\n".join(chunk for chunk in text_chunks if chunk)
+
+        if isinstance(source, bytes):
+            return source.decode("utf-8", errors="ignore")
+        with open(source, "r", encoding="utf-8", errors="ignore") as f:
             return f.read()
     
-    def _ai_extract_transactions(self, raw_content: str) -> str:
-        """Use AI to extract transaction information from raw content"""
-        
-        prompt = f"""You are a financial data extraction expert. Extract transaction information from this bank statement.
+    def _read_pdf_pages_fast(self, source: Union[str, bytes]) -> List[str]:
+        """Extract page texts with pdfium, skipping pdfminer's layout analysis"""
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(source)
+            try:
+                return [page.get_textpage().get_text_range() for page in pdf]
+            finally:
+                pdf.close()
 
-Bank Statement Content:
-{raw_content[:5000]}  
+    def _read_pdf_pages(self, source: Union[str, bytes]) -> List[str]:
+        """Extract page texts with pdfplumber; only used when pdfium fails"""
+        with pdfplumber.open(_as_file(source)) as pdf:
+            return [page.extract_text() or "" for page in pdf.pages]
 
-Extract ALL transactions and format them as a simple list. For each transaction, identify:
-- Date (if available)
-- Description/Merchant
-- Amount (mark expenses as negative)
+    def _ai_extract_transactions(self, raw_content: str) -> List[dict]:
+        """Use AI to extract transaction records from raw content"""
+        prompt = (
+            'Return JSON {"transactions":[{"date","description","amount"}]} for every '
+            'transaction (date YYYY-MM-DD or "Unknown", expenses negative). Statement:\n'
+            f"{raw_content}"
+        )
+        # Assume roughly one transaction per statement line, or per
+        # MIN_CHARS_PER_TRANSACTION when the text has few line breaks
+        expected_tx_count = max(
+            1, raw_content.count("\n"), len(raw_content) // MIN_CHARS_PER_TRANSACTION
+        )
+        max_tokens = min(MAX_EXTRACTION_TOKENS, TOKENS_PER_TRANSACTION * expected_tx_count)
 
-Format your response as a clear list of transactions, one per line, like this:
-Date: 2024-01-01 | Description: Grocery Store | Amount: -125.50
-Date: 2024-01-02 | Description: Coffee Shop | Amount: -4.50
+        for attempt in range(EXTRACTION_RETRIES):
+            try:
+                ai_output = self._invoke_llm(prompt, tier="fast", max_tokens=max_tokens)
+                break
+            except RateLimitError:
+                if attempt == EXTRACTION_RETRIES - 1:
+                    raise
+                time.sleep(EXTRACTION_BACKOFF_SECONDS * 2 ** attempt)
+        # Parsed here so malformed output fails this chunk like any other error
+        return self._parse_ai_records(ai_output)
 
-If dates are not clear, use "Unknown" for the date.
-If amounts are not clear, estimate based on context or use 0.
-Focus on actual spending transactions, ignore headers, footers, and account summaries.
+    def _split_statement(self, raw_content: str) -> List[str]:
+        """Split statement text on line boundaries into overlapping chunks"""
+        # Hard-split lines longer than a chunk so no text is ever cut off
+        lines = [
+            piece
+            for line in raw_content.splitlines()
+            for piece in (
+                textwrap.wrap(line, EXTRACTION_CHUNK_CHARS)
+                if len(line) > EXTRACTION_CHUNK_CHARS
+                else [line]
+            )
+        ]
 
-Extract the transactions now:"""
+        chunks, current, size = [], [], 0
+        for line in lines:
+            if current and size + len(line) > EXTRACTION_CHUNK_CHARS:
+                chunks.append("\n".join(current))
+                # Carry trailing lines over so a transaction on the boundary is seen whole
+                overlap, overlap_size = [], 0
+                for previous in reversed(current):
+                    if overlap_size + len(previous) > EXTRACTION_CHUNK_OVERLAP:
+                        break
+                    overlap.insert(0, previous)
+                    overlap_size += len(previous) + 1
+                current, size = overlap, overlap_size
+            current.append(line)
+            size += len(line) + 1
 
-        try:
-            response = self.llm.invoke(prompt)
-            return response.content
-        except Exception:
-            return f"Raw bank statement data:\n{raw_content[:3000]}"
+        if current:
+            chunks.append("\n".join(current))
+        return chunks or [raw_content]
+
+    async def _ai_extract_chunks(self, chunks: List[str]) -> List[Union[List[dict], Exception]]:
+        """Run AI extraction on all chunks concurrently, preserving chunk order
+        
+        Failed chunks are returned as their exception rather than raised, so the
+        caller can report how much of the statement was lost.
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXTRACTIONS)
+
+        async def extract(chunk: str) -> List[dict]:
+            async with semaphore:
+                return await asyncio.to_thread(self._ai_extract_transactions, chunk)
+
+        return await asyncio.gather(*(extract(chunk) for chunk in chunks), return_exceptions=True)
+
+    def _merge_chunk_transactions(self, chunk_records: List[List[dict]]) -> List[dict]:
+        """Merge per-chunk transactions, dropping repeats caused by chunk overlap"""
+        merged = []
+        previous_keys = set()
+        for records in chunk_records:
+            keys = set()
+            for record in records:
+                key = (record["Date"], record["Description"], record["Amount"])
+                keys.add(key)
+                if key not in previous_keys:
+                    merged.append(record)
+            previous_keys = keys
+
+        if not merged:
+            merged.append({"Date": "Unknown", "Description": NO_TRANSACTIONS_DESCRIPTION, "Amount": 0.0})
+        return merged
 
     def _extract_from_dataframe(self, df: pd.DataFrame) -> List[dict]:
         """Normalize a DataFrame into transaction records."""
@@ -110,51 +411,55 @@ Extract the transactions now:"""
         normalized.columns = [str(col).strip() for col in normalized.columns]
 
         date_col = self._find_column(normalized.columns, ["date", "transaction date", "posted date"])
-        desc_col = self._find_column(normalized.columns, ["description", "merchant", "details", "payee", "narration"])
-        amount_col = self._find_column(normalized.columns, ["amount", "transaction amount", "value", "debit"])
+        desc_col = self._find_column(normalized.columns, ["description", "desc", "merchant", "details", "payee", "narration"])
+        amount_col = self._find_column(
+            normalized.columns,
+            ["amount", "amt", "transaction amount", "value"],
+            exclude=_NOT_AMOUNT_HEADER_RE,
+        )
 
         if not amount_col:
-            debit_col = self._find_column(normalized.columns, ["debit"])
-            credit_col = self._find_column(normalized.columns, ["credit"])
+            debit_col = self._find_column(normalized.columns, ["debit", "withdrawal"])
+            credit_col = self._find_column(normalized.columns, ["credit", "deposit"])
             if debit_col and credit_col:
-                normalized["Amount"] = -normalized[debit_col].fillna(0) + normalized[credit_col].fillna(0)
+                normalized["Amount"] = (
+                    -self._parse_amounts(normalized[debit_col]) + self._parse_amounts(normalized[credit_col])
+                )
             elif debit_col:
-                normalized["Amount"] = -normalized[debit_col].fillna(0)
+                normalized["Amount"] = -self._parse_amounts(normalized[debit_col])
             elif credit_col:
-                normalized["Amount"] = normalized[credit_col].fillna(0)
+                normalized["Amount"] = self._parse_amounts(normalized[credit_col])
+            else:
+                raise ValueError(
+                    "No amount, debit or credit column found in the statement "
+                    f"(columns: {', '.join(map(str, normalized.columns))})"
+                )
         else:
             normalized["Amount"] = normalized[amount_col]
 
         if not date_col:
             normalized["Date"] = "Unknown"
         else:
-            normalized["Date"] = normalized[date_col].apply(self._normalize_date)
+            normalized["Date"] = self._normalize_dates(normalized[date_col])
 
         if not desc_col:
             normalized["Description"] = "Unknown"
         else:
-            normalized["Description"] = normalized[desc_col].astype(str).str.strip()
-
-        normalized["Amount"] = normalized["Amount"].apply(self._parse_amount)
-
-        transactions = []
-        for _, row in normalized.iterrows():
-            amount = row["Amount"]
-            if pd.isna(amount):
-                continue
-            transactions.append(
-                {
-                    "Date": row.get("Date", "Unknown"),
-                    "Description": row.get("Description", "Unknown"),
-                    "Amount": float(amount),
-                }
-            )
+            normalized["Description"] = normalized[desc_col].fillna("Unknown").astype(str).str.strip()
+
+        normalized["Amount"] = self._parse_amounts(normalized["Amount"])
+
+        transactions = (
+            normalized[["Date", "Description", "Amount"]]
+            .dropna(subset=["Amount"])
+            .to_dict("records")
+        )
 
         if not transactions:
-            transactions.append({"Date": "Unknown", "Description": "No transactions found", "Amount": 0.0})
+            transactions.append({"Date": "Unknown", "Description": NO_TRANSACTIONS_DESCRIPTION, "Amount": 0.0})
 
         # Detect currency from the data
-        currency = self._detect_currency(transactions)
+        currency = self._detect_currency(normalized["Description"])
         
         # Add currency info to the first transaction as metadata
         if transactions:
@@ -162,26 +467,46 @@ Extract the transactions now:"""
 
         return transactions
     
-    def _detect_currency(self, transactions: List[dict]) -> str:
-        """Detect currency from transaction data"""
-        # Check if any description or amount contains currency symbols
-        for trans in transactions[:10]:  # Check first 10 transactions
-            desc = str(trans.get("Description", "")).lower()
-            if "₹" in desc or "inr" in desc or "rupee" in desc:
-                return "₹"
-            if "$" in desc or "usd" in desc or "dollar" in desc:
-                return "$"
+    def _detect_currency(self, descriptions: pd.Series) -> str:
+        """Detect currency from the transaction descriptions"""
+        # Scan every description in one vectorized pass per currency
+        descriptions = descriptions.astype(str)
+        if descriptions.str.contains(_INR_RE).any():
+            return "₹"
+        if descriptions.str.contains(_USD_RE).any():
+            return "$"
         
         # Default to ₹ for Indian users (can be changed based on locale)
         return "₹"
 
-    def _find_column(self, columns, keywords):
+    def _find_column(self, columns, keywords, exclude: Optional[re.Pattern] = None):
+        if exclude is not None:
+            columns = [column for column in columns if not exclude.search(column)]
         for column in columns:
             col_lower = column.lower()
             for keyword in keywords:
                 if keyword in col_lower:
                     return column
-        return None
+        return self._fuzzy_find_column(columns, keywords)
+
+    def _fuzzy_find_column(self, columns, keywords):
+        """Match misspelled headers ("Amout", "Descripton") by similarity"""
+        # Imported lazily: only messy headers ever reach this path
+        from rapidfuzz import fuzz, process, utils
+
+        columns = list(columns)
+        best_column, best_score = None, 0
+        for keyword in keywords:
+            match = process.extractOne(
+                keyword,
+                columns,
+                scorer=fuzz.WRatio,
+                processor=utils.default_process,
+                score_cutoff=FUZZY_COLUMN_CUTOFF,
+            )
+            if match and match[1] > best_score:
+                best_column, best_score = match[0], match[1]
+        return best_column
 
     def _parse_amount(self, value: Optional[str]) -> float:
         if value is None or (isinstance(value, float) and pd.isna(value)):
@@ -189,15 +514,55 @@ Extract the transactions now:"""
         try:
             if isinstance(value, (int, float)):
                 return float(value)
-            # Remove currency symbols and formatting
-            cleaned = str(value).replace(",", "").replace("$", "").replace("₹", "").replace("Rs", "").replace("rs", "").replace("INR", "").replace("inr", "").strip()
-            # Remove any remaining non-numeric characters except minus sign and decimal point
-            cleaned = re.sub(r'[^\d\.\-]', '', cleaned)
-            return float(cleaned)
+            # Currency symbols, separators and codes are all stripped in one pass
+            return float(_NON_NUMERIC_RE.sub("", str(value)))
         except ValueError:
             return 0.0
 
+    def _parse_amounts(self, values: pd.Series) -> pd.Series:
+        """Vectorized _parse_amount over a whole column"""
+        if pd.api.types.is_numeric_dtype(values):
+            return values.astype(float).fillna(0.0)
+        cleaned = values.astype(str).str.replace(_NON_NUMERIC_RE, "", regex=True)
+        return pd.to_numeric(cleaned, errors="coerce").astype(float).fillna(0.0)
+
+    def _normalize_dates(self, values: pd.Series) -> pd.Series:
+        """Vectorized _normalize_date over a whole column"""
+        if pd.api.types.is_numeric_dtype(values):
+            # Numeric dates (e.g. 20240105) would otherwise be read as epoch nanoseconds
+            text = values.astype(str).str.replace(r"\.0$", "", regex=True)
+            parsed = pd.to_datetime(text, errors="coerce", format="%Y%m%d")
+            fallback = text.where(values.notna(), "Unknown")
+            return parsed.dt.strftime("%Y-%m-%d").where(parsed.notna(), fallback)
+
+        # The common case is one consistent format, parsed in a single C-level pass.
+        # The format is inferred from the first value, so when rows fail, also try
+        # day-first (DD/MM) and keep whichever order parses more of the column.
+        dayfirst = False
+        parsed = pd.to_datetime(values, errors="coerce")
+        if (parsed.isna() & values.notna()).any():
+            parsed_dayfirst = pd.to_datetime(values, errors="coerce", dayfirst=True)
+            if parsed_dayfirst.isna().sum() < parsed.isna().sum():
+                dayfirst, parsed = True, parsed_dayfirst
+
+        # ISO values (YYYY-MM-DD) are unambiguous, so keep them out of the day-first retry
+        retry = parsed.isna() & values.notna()
+        iso = retry & values.astype(str).str.match(r"\s*\d{4}-")
+        if iso.any():
+            parsed[iso] = pd.to_datetime(values[iso], errors="coerce", format="ISO8601")
+            retry &= ~iso
+
+        # Remaining values are re-parsed one by one, with the column's day/month order
+        if retry.any():
+            parsed[retry] = pd.to_datetime(
+                values[retry], errors="coerce", format="mixed", dayfirst=dayfirst
+            )
+        # Unparseable values keep their original text, as _normalize_date does
+        fallback = values.astype(str).where(values.notna(), "Unknown")
+        return parsed.dt.strftime("%Y-%m-%d").where(parsed.notna(), fallback)
+
     def _normalize_date(self, value) -> str:
+        """Normalize a single date value; DataFrames use _normalize_dates"""
         if pd.isna(value):
             return "Unknown"
         if isinstance(value, datetime):
@@ -210,26 +575,22 @@ Extract the transactions now:"""
             except ValueError:
                 return str(value)
 
-    def _parse_ai_transactions(self, ai_output: str) -> List[dict]:
-        pattern = re.compile(
-            r"Date:\s*(?P<date>.+?)\s*\|\s*Description:\s*(?P<description>.+?)\s*\|\s*Amount:\s*(?P<amount>[-\d\.,]+)",
-            re.IGNORECASE,
-        )
-        records = []
-        for line in ai_output.splitlines():
-            if not line.strip():
-                continue
-            match = pattern.search(line)
-            if match:
-                records.append(
-                    {
-                        "Date": match.group("date").strip(),
-                        "Description": match.group("description").strip(),
-                        "Amount": self._parse_amount(match.group("amount")),
-                    }
-                )
-
-        if not records:
-            records.append({"Date": "Unknown", "Description": ai_output[:40], "Amount": 0.0})
+    def _parse_ai_records(self, ai_output: str) -> List[dict]:
+        """Parse the JSON-mode extraction output; malformed output raises ValueError"""
+        try:
+            data = json.loads(ai_output)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"AI returned invalid JSON: {e}") from e
 
-        return records
+        items = data.get("transactions", []) if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise ValueError("AI returned no transactions list")
+        return [
+            {
+                "Date": str(item.get("date") or "Unknown").strip(),
+                "Description": str(item.get("description") or "Unknown").strip(),
+                "Amount": self._parse_amount(item.get("amount")),
+            }
+            for item in items
+            if isinstance(item, dict)
+        ]
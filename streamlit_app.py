@@ -2,12 +2,19 @@
 Finance Insights - Streamlit UI for Multi-Agent System
 """
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from smart_processor import SmartBankStatementProcessor
-from crew import analyze_finances
-import json
+
+from llm_cache import DISK_CACHE_ENABLED, LLM_CACHE_TTL_SECONDS
+
+# The processor and crew (CrewAI, LangChain, Groq, pandas) are imported on
+# first use so the page itself loads without paying for them
+
+
+@st.cache_resource
+def get_processor():
+    """Share one processor (and its completion cache) across reruns and sessions"""
+    from smart_processor import SmartBankStatementProcessor
+    return SmartBankStatementProcessor()
+
 
 # Page configuration
 st.set_page_config(
@@ -71,15 +78,17 @@ with st.sidebar:
     st.markdown("- PDF bank statements")
 
 # Main content
-uploaded_file = st.file_uploader(
-    "Upload Your Bank Statement",
+uploaded_files = st.file_uploader(
+    "Upload Your Bank Statements",
     type=['csv', 'xlsx', 'xls', 'pdf'],
-    help="Upload your monthly bank statement in CSV, Excel, or PDF format"
+    accept_multiple_files=True,
+    help="Upload one or more monthly bank statements in CSV, Excel, or PDF format"
 )
 
-if uploaded_file is not None:
+if uploaded_files:
     # Show file details
-    st.success(f"✅ File uploaded: {uploaded_file.name} ({uploaded_file.size / 1024:.2f} KB)")
+    for uploaded_file in uploaded_files:
+        st.success(f"✅ File uploaded: {uploaded_file.name} ({uploaded_file.size / 1024:.2f} KB)")
     
     # Analyze button
     if st.button("🚀 Analyze My Spending", type="primary", use_container_width=True):
@@ -89,22 +98,23 @@ if uploaded_file is not None:
         status_text = st.empty()
         
         try:
-            # Step 1: Process file
-            status_text.text("📄 Processing bank statement...")
-            progress_bar.progress(20)
+            from crew import analyze_finances, analyze_statements
             
-            # Save uploaded file temporarily
-            temp_path = f"temp_{uploaded_file.name}"
-            with open(temp_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
+            # Step 1: Process files
+            status_text.text("📄 Processing bank statements...")
+            progress_bar.progress(20)
             
-            # Process the file
-            processor = SmartBankStatementProcessor()
-            transaction_data = processor.process_file(temp_path)
+            # Process the uploads straight from memory
+            processor = get_processor()
+            all_transactions = [
+                processor.extract_transactions(uploaded_file, uploaded_file.name)
+                for uploaded_file in uploaded_files
+            ]
             
-            # Clean up temp file
-            import os
-            os.remove(temp_path)
+            # The agents only see totals and the largest transactions
+            transaction_data = [
+                processor.summarize_for_llm(transactions) for transactions in all_transactions
+            ]
             
             progress_bar.progress(40)
             
@@ -112,27 +122,57 @@ if uploaded_file is not None:
             status_text.text("🤖 AI agents analyzing your spending patterns...")
             progress_bar.progress(50)
             
-            results = analyze_finances(transaction_data)
-            
-            # Step 3: Display results
-            status_text.text("📊 Displaying insights...")
-            
-            progress_bar.progress(100)
-            status_text.text("✅ Analysis complete!")
-            
-            # Display results
             st.markdown("---")
             st.header("📈 Your Financial Analysis")
             
-            # Show analysis from Spending Analyst
-            st.subheader("⚡ Spending Analysis")
-            st.markdown(results['analysis'])
+            from smart_processor import NO_TRANSACTIONS_DESCRIPTION
             
-            st.markdown("---")
+            with st.expander("🧾 Extracted Transactions"):
+                for uploaded_file, transactions in zip(uploaded_files, all_transactions):
+                    # Drop the placeholder row and metadata keys such as _currency
+                    rows = [
+                        {key: value for key, value in transaction.items() if not key.startswith("_")}
+                        for transaction in transactions
+                        if transaction["Description"] != NO_TRANSACTIONS_DESCRIPTION
+                    ]
+                    st.markdown(f"**{uploaded_file.name}** ({len(rows)} transactions)")
+                    st.dataframe(rows, use_container_width=True)
             
-            # Show recommendations from Financial Advisor
-            st.subheader("⭐ Personalized Recommendations")
-            st.markdown(results['recommendations'])
+            if len(uploaded_files) == 1:
+                # Placeholders are filled in as each agent finishes its task
+                sections = [
+                    ("⚡ Spending Analysis", st.container()),
+                    ("⭐ Personalized Recommendations", st.container()),
+                ]
+                completed = []
+                
+                def render_task_output(task_output):
+                    title, container = sections[len(completed)]
+                    with container:
+                        if completed:
+                            st.markdown("---")
+                        st.subheader(title)
+                        st.markdown(str(task_output))
+                    completed.append(task_output)
+                    progress_bar.progress(50 + 25 * len(completed))
+                    if len(completed) < len(sections):
+                        status_text.text("💡 Financial advisor preparing recommendations...")
+                
+                analyze_finances(transaction_data[0], on_task_complete=render_task_output)
+            else:
+                # Statements are analyzed concurrently, then shown one tab per file
+                all_results = analyze_statements(transaction_data)
+                tabs = st.tabs([uploaded_file.name for uploaded_file in uploaded_files])
+                for tab, results in zip(tabs, all_results):
+                    with tab:
+                        st.subheader("⚡ Spending Analysis")
+                        st.markdown(results['analysis'])
+                        st.markdown("---")
+                        st.subheader("⭐ Personalized Recommendations")
+                        st.markdown(results['recommendations'])
+            
+            progress_bar.progress(100)
+            status_text.text("✅ Analysis complete!")
             
         except Exception as e:
             st.error(f"❌ Error during analysis: {str(e)}")
@@ -142,7 +182,7 @@ if uploaded_file is not None:
 
 else:
     # Show example format
-    st.info("👆 Upload a bank statement to get started!")
+    st.info("👆 Upload one or more bank statements to get started!")
     
     with st.expander("📝 Example CSV Format"):
         st.code("""Date,Description,Amount
@@ -158,9 +198,13 @@ else:
         st.markdown("- **Amount**: Transaction amount (negative for expenses)")
 
 # Footer
+if DISK_CACHE_ENABLED:
+    storage_note = f"Extracted transactions and analyses are cached on this server for {LLM_CACHE_TTL_SECONDS // 3600} hours"
+else:
+    storage_note = "Your data is processed securely and never written to disk"
 st.markdown("---")
-st.markdown("""
+st.markdown(f"""
 <div style='text-align: center; color: #888;'>
-    <p>Powered by CrewAI Multi-Agent System | Your data is processed securely and never stored</p>
+    <p>Powered by CrewAI Multi-Agent System | {storage_note}</p>
 </div>
 """, unsafe_allow_html=True)